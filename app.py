@@ -1,9 +1,19 @@
+import asyncio
+import hashlib
 import os
 import json
-from typing import Any, Dict, List, Optional
-
+import pickle
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import ijson
+import numpy as np
+import orjson
 import streamlit as st
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 def set_api_key_from_ui():
@@ -12,29 +22,47 @@ def set_api_key_from_ui():
         st.header("API Settings")
         user_key = st.text_input("OpenAI API Key", type="password", help="Your key is only used in this session.")
         if user_key:
-            os.environ["OPENAI_API_KEY"] = user_key
+            if os.environ.get("OPENAI_API_KEY") != user_key:
+                os.environ["OPENAI_API_KEY"] = user_key
+                get_client.clear()  # Drop the cached client built with the old key
 
 
+@st.cache_resource
 def get_client() -> OpenAI:
-    return OpenAI()
+    # Reuse the client (and its keep-alive TLS connection) across Streamlit
+    # reruns instead of rebuilding the transport on every widget interaction.
+    return OpenAI(
+        http_client=httpx.Client(http2=True, limits=httpx.Limits(max_keepalive_connections=4)),
+    )
+
+
+def build_system_prompt() -> str:
+    # Everything here is identical across sessions and users so that the
+    # provider-side prompt cache can hit on the full system message.
+    prompt = """
+You are a startup-curation research agent. Curate a list of high-potential startups to apply to, focusing on core products and the problems they solve, founders' mentality and culture signals, alignment with the candidate's interests and skills, and open-source involvement.
+
+Rules:
+- Return ONLY valid, minified JSON (no comments, no markdown fences).
+- Use "unknown" or an empty string for any fact you are unsure of; do NOT invent links.
+- Prefer startups that meaningfully align with the candidate profile; mix fresh/newer and enduring, mission-aligned companies.
+- If companies are provided, vet and rank them first, then fill remaining slots with suggestions.
+- Limit the list to exactly the number of startups requested in the user message; ensure diversity; keep fields concise but specific.
+
+JSON schema (generated_at is an ISO-8601 timestamp, confidence a float 0-1):
+{"generated_at":"","query_summary":"","startups":[{"name":"","website":"","hq_location":"","stage":"pre-seed|seed|series-a|series-b|growth|unknown","team_size":"","core_product":"","founders":[{"name":"","background":"","mentality_notes":""}],"open_source_involvement":{"level":"none|partial|core|unknown","repos":[{"name":"","url":""}]},"why_aligned":"","suggested_roles":[""],"example_outreach":"","sources":[{"label":"website|github|other","url":""}],"confidence":0.0}],"notes":"","next_actions":[""]}
+"""
+    return prompt.strip()
 
 
+@st.cache_data(show_spinner=False)
 def build_user_prompt(
     profile: Dict[str, Any],
     prefs: Dict[str, Any],
-    provided_companies: List[str],
+    provided_companies: Tuple[str, ...],
     top_n: int,
 ) -> str:
     prompt = f"""
-You are a startup-curation research agent.
-
-Task:
-Curate a list of high-potential startups to apply to, focusing on:
-- Core products and what problems they solve
-- Founders’ mentality and culture signals
-- Alignment with the candidate’s interests and skills
-- Bonus points for open-source involvement (products, tooling, or contributions)
-
 Input:
 - Candidate Profile:
   - Name: {profile.get("name") or "N/A"}
@@ -55,166 +83,454 @@ Input:
   - Geographic Focus: {prefs.get("geo") or "Any"}
 
 - Provided companies to vet (optional):
-  {provided_companies if provided_companies else "None"}
+  {list(provided_companies) if provided_companies else "None"}
 
-Output requirements:
-- Return ONLY valid, minified JSON (no comments, no markdown fences).
-- If you are unsure of a fact, use "unknown" or empty strings.
-- Do NOT invent links. Only include links you are reasonably confident about.
-- Prefer startups that meaningfully align with the candidate profile.
-- Include both: (1) fresh/newer companies if relevant, and (2) enduring, mission-aligned companies.
-- If the user provided companies, prioritize vetting and ranking them, and fill remaining slots with additional suggestions.
-
-JSON schema:
-{{
-  "generated_at": "<ISO-8601 timestamp>",
-  "query_summary": "<short summary of how you interpreted the candidate's profile and constraints>",
-  "startups": [
-    {{
-      "name": "<company name>",
-      "website": "<official website or empty>",
-      "hq_location": "<city/country or remote or unknown>",
-      "stage": "<pre-seed|seed|series-a|series-b|growth|unknown>",
-      "team_size": "<approx or unknown>",
-      "core_product": "<clear summary of product and problem solved>",
-      "founders": [
-        {{
-          "name": "<founder name or unknown>",
-          "background": "<short background or unknown>",
-          "mentality_notes": "<signals on builder mindset, product-first, frugality, research orientation, etc.>"
-        }}
-      ],
-      "open_source_involvement": {{
-        "level": "<none|partial|core|unknown>",
-        "repos": [
-          {{"name": "<repo name>", "url": "<repo url>"}}
-        ]
-      }},
-      "why_aligned": "<explicit alignment with candidate's interests, skills, and values>",
-      "suggested_roles": ["<role 1>", "<role 2>"],
-      "example_outreach": "<a short, tailored outreach note the candidate could send>",
-      "sources": [
-        {{"label": "website", "url": "<url or empty>"}},
-        {{"label": "github", "url": "<url or empty>"}},
-        {{"label": "other", "url": "<url or empty>"}}
-      ],
-      "confidence": <float between 0 and 1>
-    }}
-  ],
-  "notes": "<disclaimers and what to validate next>",
-  "next_actions": ["<suggested next steps for the candidate>"]
-}}
-
-Constraints:
-- Limit the list to exactly {top_n} startups.
-- Ensure diversity of choices while adhering to preferences.
-- Keep fields concise but specific.
+Limit the list to exactly {top_n} startups.
 """
     return prompt.strip()
 
 
-def clean_json_text(text: str) -> str:
-    text = text.strip()
-    # Remove Markdown code fences if present
-    if text.startswith("```"):
-        lines = text.splitlines()
-        # Remove first and last fence lines
-        if len(lines) >= 2 and lines[-1].strip().startswith("```"):
-            text = "\n".join(lines[1:-1])
-    return text.strip()
+class _ChunkReader:
+    """Minimal file-like adapter that feeds streamed deltas to ijson."""
 
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._pending = b""
 
-def call_model(client: OpenAI, model: str, prompt: str, temperature: float = 0.4, max_tokens: int = 1800) -> str:
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""  # ijson's type sniff; must not consume the stream
+        if self._pending:
+            data = self._pending
+            self._pending = b""
+        else:
+            # Return as soon as any data arrives (a short read) so ijson can
+            # parse completed objects while the model is still generating;
+            # accumulating the full `size` would block until StopIteration.
+            try:
+                data = next(self._chunks)
+            except StopIteration:
+                return b""
+        if size < 0:
+            return data + b"".join(self._chunks)
+        if len(data) > size:
+            data, self._pending = data[:size], data[size:]
+        return data
+
+
+def call_model(
+    client: OpenAI,
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float = 0.4,
+    *,
+    max_tokens: int,
+    placeholder=None,
+    on_startup=None,
+) -> str:
+    # Stream tokens as they are generated so the UI can show progress
+    # instead of blocking until the full completion arrives.
     response = client.chat.completions.create(
-        model=model,  # "gpt-4" or "gpt-3.5-turbo"
+        model=model,
         messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "system", "content": system_prompt},
             {"role": "user", "content": prompt},
         ],
         temperature=temperature,
         max_tokens=max_tokens,
+        response_format={"type": "json_object"},
+        stream=True,
     )
-    return response.choices[0].message.content
+    buffer: List[str] = []
+
+    def deltas():
+        for i, chunk in enumerate(response):
+            delta = chunk.choices[0].delta.content or ""
+            buffer.append(delta)
+            # Update the placeholder every few chunks to avoid flooding reruns
+            if placeholder is not None and i % 10 == 0:
+                received = sum(len(b) for b in buffer)
+                placeholder.markdown(f"Curating startups... ({received} characters received)")
+            if delta:
+                yield delta.encode()
+
+    stream = deltas()
+    if on_startup is not None:
+        # Feed the stream through ijson so each completed startups[i] object
+        # can be surfaced while the model is still generating later ones.
+        try:
+            for obj in ijson.items(_ChunkReader(stream), "startups.item"):
+                on_startup(obj)
+        except Exception:
+            pass  # Incremental parse is best-effort; the final parse decides
+    # Drain whatever the incremental parser didn't consume
+    for _ in stream:
+        pass
+    if placeholder is not None:
+        placeholder.empty()
+    return "".join(buffer)
+
+
+class _SchemaModel(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _none_to_default(cls, v, info):
+        # The model sometimes emits null for fields it can't fill; fall back
+        # to the field default the same way the old `.get(...) or` chains did
+        if v is None:
+            return cls.model_fields[info.field_name].get_default(call_default_factory=True)
+        return v
+
+
+class Founder(_SchemaModel):
+    name: str = "unknown"
+    background: str = "unknown"
+    mentality_notes: str = ""
+
+
+class Repo(_SchemaModel):
+    name: str = "repo"
+    url: str = ""
+
+
+class OpenSourceInvolvement(_SchemaModel):
+    level: str = "unknown"
+    repos: List[Repo] = []
+
+
+class Source(_SchemaModel):
+    label: str = "link"
+    url: str = ""
+
+
+class Startup(_SchemaModel):
+    name: str = "Unnamed Startup"
+    website: str = ""
+    hq_location: str = ""
+    stage: str = "unknown"
+    team_size: str = "unknown"
+    core_product: str = "unknown"
+    founders: List[Founder] = []
+    open_source_involvement: OpenSourceInvolvement = OpenSourceInvolvement()
+    why_aligned: str = ""
+    suggested_roles: List[str] = []
+    example_outreach: str = ""
+    sources: List[Source] = []
+    confidence: Optional[float] = None
+
+
+class CurationResult(_SchemaModel):
+    generated_at: str = ""
+    query_summary: str = ""
+    startups: List[Startup] = []
+    notes: str = ""
+    next_actions: List[str] = []
+
+
+CACHE_DIR = ".cache"
+FANOUT_THRESHOLD = 6  # vetting-list size above which requests are parallelized
+FANOUT_CHUNK_SIZE = 4
+SEMANTIC_CACHE_PATH = os.path.join(CACHE_DIR, "semantic_cache.pkl")
+SEMANTIC_CACHE_TTL = 24 * 60 * 60  # seconds
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def _semantic_cache_key(profile: Dict[str, Any], prefs: Dict[str, Any], provided_companies: List[str], top_n: int) -> str:
+    # Stable JSON serialization so the same inputs always embed identically
+    return json.dumps(
+        {"profile": profile, "prefs": prefs, "companies": provided_companies, "top_n": top_n},
+        sort_keys=True,
+    )
+
 
+def _embed(client: OpenAI, text: str) -> np.ndarray:
+    response = client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return np.array(response.data[0].embedding, dtype=np.float32)
 
-def parse_json_response(text: str) -> Optional[Dict[str, Any]]:
+
+def _load_semantic_entries() -> List[Dict[str, Any]]:
+    if not os.path.exists(SEMANTIC_CACHE_PATH):
+        return []
     try:
-        cleaned = clean_json_text(text)
-        return json.loads(cleaned)
+        with open(SEMANTIC_CACHE_PATH, "rb") as fh:
+            return pickle.load(fh)
     except Exception:
+        return []
+
+
+def semantic_lookup(
+    client: OpenAI,
+    model: str,
+    profile: Dict[str, Any],
+    prefs: Dict[str, Any],
+    provided_companies: List[str],
+    top_n: int,
+    threshold: float = 0.95,
+) -> Tuple[Optional[str], np.ndarray]:
+    # Near-duplicate prompts (minor phrasing tweaks) miss the exact-string
+    # cache; match them by cosine similarity over embeddings instead.
+    embedding = _embed(client, _semantic_cache_key(profile, prefs, provided_companies, top_n))
+    now = time.time()
+    best_sim = 0.0
+    best_raw: Optional[str] = None
+    for entry in _load_semantic_entries():
+        if entry["model"] != model or now - entry["ts"] > SEMANTIC_CACHE_TTL:
+            continue
+        other = entry["embedding"]
+        sim = float(np.dot(embedding, other) / (np.linalg.norm(embedding) * np.linalg.norm(other)))
+        if sim > best_sim:
+            best_sim = sim
+            best_raw = entry["raw"]
+    if best_sim > threshold:
+        return best_raw, embedding
+    return None, embedding
+
+
+def semantic_store(model: str, embedding: np.ndarray, raw: str) -> None:
+    entries = _load_semantic_entries()
+    now = time.time()
+    entries = [e for e in entries if now - e["ts"] <= SEMANTIC_CACHE_TTL]
+    entries.append({"model": model, "embedding": embedding, "raw": raw, "ts": now})
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(SEMANTIC_CACHE_PATH, "wb") as fh:
+        pickle.dump(entries, fh)
+
+
+def _cache_path(model: str, temperature: float, system_prompt: str, prompt: str) -> str:
+    key = hashlib.sha256(f"{model}|{temperature}|{system_prompt}|{prompt}".encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _cache_read(path: str) -> Optional[str]:
+    if not os.path.exists(path):
         return None
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)["raw"]
+    except Exception:
+        return None  # Corrupt cache entry; treat as a miss
+
+
+def _cache_write(path: str, text: str) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"raw": text, "ts": time.time()}, fh)
 
 
-def render_startup_card(s: Dict[str, Any]):
+def cached_call_model(
+    client: OpenAI,
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float = 0.4,
+    *,
+    max_tokens: int,
+    placeholder=None,
+    on_startup=None,
+) -> str:
+    # Identical (model, temperature, prompt) inputs always produce a reusable
+    # response, so skip the OpenAI round-trip entirely on a cache hit.
+    cache_path = _cache_path(model, temperature, system_prompt, prompt)
+    cached = _cache_read(cache_path)
+    if cached is not None:
+        if placeholder is not None:
+            placeholder.empty()
+        return cached
+    text = call_model(
+        client,
+        model,
+        system_prompt,
+        prompt,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        placeholder=placeholder,
+        on_startup=on_startup,
+    )
+    _cache_write(cache_path, text)
+    return text
+
+
+async def call_model_async(
+    client: AsyncOpenAI,
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float = 0.4,
+    *,
+    max_tokens: int,
+) -> str:
+    response = await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        response_format={"type": "json_object"},
+    )
+    return response.choices[0].message.content
+
+
+def call_model_fanout(
+    model: str,
+    system_prompt: str,
+    prompts: List[str],
+    temperature: float = 0.4,
+    *,
+    max_tokens: int,
+    use_cache: bool = False,
+) -> List[str]:
+    # Each request decodes in its own server-side slot, so dispatching the
+    # chunks concurrently cuts wall-clock time roughly by the fan-out factor.
+    # The disk cache is consulted per chunk so only the misses are fetched.
+    results: List[Optional[str]] = [None] * len(prompts)
+    if use_cache:
+        for i, p in enumerate(prompts):
+            results[i] = _cache_read(_cache_path(model, temperature, system_prompt, p))
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+
+        async def _gather() -> List[str]:
+            client = AsyncOpenAI()
+            return await asyncio.gather(
+                *[
+                    call_model_async(
+                        client, model, system_prompt, prompts[i], temperature=temperature, max_tokens=max_tokens
+                    )
+                    for i in missing
+                ]
+            )
+
+        for i, text in zip(missing, asyncio.run(_gather())):
+            results[i] = text
+            if use_cache:
+                _cache_write(_cache_path(model, temperature, system_prompt, prompts[i]), text)
+    return results
+
+
+def merge_curations(results: List[Optional[CurationResult]], top_n: int) -> Optional[CurationResult]:
+    parsed = [r for r in results if r]
+    if not parsed:
+        return None
+    merged = parsed[0].model_copy(deep=True)
+    startups: List[Startup] = []
+    seen = set()
+    default_name = Startup.model_fields["name"].default.lower()
+    for r in parsed:
+        for s in r.startups:
+            name = s.name.strip().lower()
+            # Validation defaults missing names to "Unnamed Startup"; that
+            # isn't an identity, so never dedupe on it.
+            if name != default_name:
+                if name in seen:
+                    continue
+                seen.add(name)
+            startups.append(s)
+    merged.startups = startups[:top_n]
+    merged.notes = " ".join(filter(None, (r.notes for r in parsed)))
+    merged.next_actions = [na for r in parsed for na in r.next_actions]
+    return merged
+
+
+ROUTING_THRESHOLD = 1200  # complexity score above which gpt-4o is used
+
+
+def choose_model(profile: Dict[str, Any], prefs: Dict[str, Any], provided_companies: List[str]) -> str:
+    # Simple profiles don't need the slowest, most expensive model; escalate
+    # only when the inputs are long or there is a sizeable vetting list.
+    # Both targets support JSON mode (legacy gpt-4 does not).
+    score = sum(len(str(v)) for v in profile.values())
+    score += sum(len(str(v)) for v in prefs.values())
+    score += sum(len(c) for c in provided_companies)
+    score += 200 * len(provided_companies)
+    return "gpt-4o" if score >= ROUTING_THRESHOLD else "gpt-4o-mini"
+
+
+@st.cache_data(show_spinner=False)
+def parse_json_response(text: str) -> Optional[CurationResult]:
+    # Cached so post-generation reruns don't re-parse the same response.
+    # JSON mode guarantees bare JSON, so no fence-stripping pass is needed.
+    try:
+        data = orjson.loads(text)
+    except Exception:
+        return None
+    if not isinstance(data, dict):
+        return None
+    raw_startups = data.pop("startups", None) or []
+    try:
+        result = CurationResult.model_validate(data)
+    except Exception:
+        return None
+    # Validate entries individually so one malformed startup is dropped
+    # instead of failing the whole result.
+    for obj in raw_startups:
+        try:
+            result.startups.append(Startup.model_validate(obj))
+        except Exception:
+            continue
+    return result
+
+
+@st.fragment
+def render_startup_card(s: Startup):
+    # As a fragment, widget interactions inside a card re-run only that
+    # card instead of the whole script.
     col1, col2 = st.columns([0.7, 0.3])
     with col1:
-        title = s.get("name") or "Unnamed Startup"
-        website = (s.get("website") or "").strip()
+        website = s.website.strip()
         if website:
-            st.subheader(f"{title} — {website}")
+            st.subheader(f"{s.name} — {website}")
         else:
-            st.subheader(title)
-        st.caption(s.get("hq_location") or "Location: unknown")
+            st.subheader(s.name)
+        st.caption(s.hq_location or "Location: unknown")
 
     with col2:
-        stage = s.get("stage") or "unknown"
-        size = s.get("team_size") or "unknown"
-        st.metric("Stage", stage)
-        st.metric("Team Size", size)
+        st.metric("Stage", s.stage or "unknown")
+        st.metric("Team Size", s.team_size or "unknown")
 
-    st.write(f"Core Product: {s.get('core_product') or 'unknown'}")
+    st.write(f"Core Product: {s.core_product or 'unknown'}")
 
-    founders = s.get("founders") or []
-    if founders:
+    if s.founders:
         with st.expander("Founders and mentality", expanded=False):
-            for f in founders:
-                name = f.get("name") or "unknown"
-                bg = f.get("background") or "unknown"
-                notes = f.get("mentality_notes") or "—"
-                st.write(f"- {name}: {bg}")
-                if notes and notes != "—":
-                    st.caption(f"  Mentality: {notes}")
-
-    oss = s.get("open_source_involvement") or {}
-    oss_level = oss.get("level") or "unknown"
-    repos = oss.get("repos") or []
-    with st.expander(f"Open Source: {oss_level}", expanded=False):
-        if repos:
-            for r in repos:
-                rname = r.get("name") or "repo"
-                rurl = r.get("url") or ""
-                if rurl:
-                    st.write(f"- {rname}: {rurl}")
+            for f in s.founders:
+                st.write(f"- {f.name or 'unknown'}: {f.background or 'unknown'}")
+                if f.mentality_notes:
+                    st.caption(f"  Mentality: {f.mentality_notes}")
+
+    oss = s.open_source_involvement
+    with st.expander(f"Open Source: {oss.level or 'unknown'}", expanded=False):
+        if oss.repos:
+            for r in oss.repos:
+                if r.url:
+                    st.write(f"- {r.name}: {r.url}")
                 else:
-                    st.write(f"- {rname}")
+                    st.write(f"- {r.name}")
         else:
             st.write("No repos listed.")
 
-    st.write(f"Why aligned: {s.get('why_aligned') or '—'}")
+    st.write(f"Why aligned: {s.why_aligned or '—'}")
 
-    roles = s.get("suggested_roles") or []
-    if roles:
-        st.write("Suggested roles: " + ", ".join(roles))
+    if s.suggested_roles:
+        st.write("Suggested roles: " + ", ".join(s.suggested_roles))
 
-    outreach = s.get("example_outreach") or ""
-    if outreach:
+    if s.example_outreach:
         with st.expander("Example outreach", expanded=False):
-            st.code(outreach)
+            st.code(s.example_outreach)
 
-    sources = s.get("sources") or []
-    if sources:
+    if s.sources:
         with st.expander("Sources / Links", expanded=False):
-            for src in sources:
-                label = src.get("label") or "link"
-                url = src.get("url") or ""
-                if url:
-                    st.write(f"- {label}: {url}")
+            for src in s.sources:
+                if src.url:
+                    st.write(f"- {src.label}: {src.url}")
                 else:
-                    st.write(f"- {label}: (unknown)")
+                    st.write(f"- {src.label}: (unknown)")
 
-    conf = s.get("confidence")
-    if isinstance(conf, (float, int)):
-        st.progress(min(max(conf, 0.0), 1.0))
+    if s.confidence is not None:
+        st.progress(min(max(s.confidence, 0.0), 1.0))
 
 
 def main():
@@ -248,35 +564,59 @@ def main():
         provided_raw = st.text_area("Provide companies to vet (one per line)", placeholder="company1\ncompany2\n...")
 
         st.header("Generation Settings")
-        model_choice = st.selectbox("Model", ["gpt-4", "gpt-3.5-turbo"], index=0)
+        model_choice = st.selectbox(
+            "Model",
+            ["auto", "gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo"],
+            index=0,
+            help="'auto' routes simple profiles to gpt-4o-mini and escalates complex ones to gpt-4o.",
+        )
         top_n = st.slider("How many startups?", min_value=3, max_value=15, value=8, step=1)
         temperature = st.slider("Creativity (temperature)", min_value=0.0, max_value=1.0, value=0.4, step=0.1)
+        use_cache = st.checkbox("Use cache", value=True, help="Reuse a saved response for identical inputs.")
+        semantic_threshold = st.slider(
+            "Semantic cache threshold",
+            min_value=0.80,
+            max_value=1.0,
+            value=0.95,
+            step=0.01,
+            help="Reuse a saved response when inputs are this similar (cosine similarity).",
+        )
 
     client = get_client()
 
+    if "warmed" not in st.session_state and os.environ.get("OPENAI_API_KEY"):
+        # Establish the DNS + TLS + HTTP/2 handshake during user think-time
+        # so the first generation doesn't pay for it on the critical path.
+        threading.Thread(target=lambda: client.models.list(), daemon=True).start()
+        st.session_state["warmed"] = True
+
     profile = {
-        "name": name.strip() if name else "",
-        "headline": headline.strip() if headline else "",
-        "skills": skills.strip() if skills else "",
-        "interests": interests.strip() if interests else "",
-        "values": values.strip() if values else "",
-        "links": links.strip() if links else "",
+        k: (v.strip() if v else "")
+        for k, v in [
+            ("name", name),
+            ("headline", headline),
+            ("skills", skills),
+            ("interests", interests),
+            ("values", values),
+            ("links", links),
+        ]
     }
 
     prefs = {
-        "sectors": sectors.strip() if sectors else "",
-        "stage": stage,
-        "team_size": team_size.strip() if team_size else "",
-        "location": location.strip() if location else "",
-        "oss_importance": oss_importance,
-        "geo": geo.strip() if geo else "",
-        "other": other.strip() if other else "",
-        "exclude": exclude.strip() if exclude else "",
+        k: (v.strip() if v else "")
+        for k, v in [
+            ("sectors", sectors),
+            ("stage", stage),
+            ("team_size", team_size),
+            ("location", location),
+            ("oss_importance", oss_importance),
+            ("geo", geo),
+            ("other", other),
+            ("exclude", exclude),
+        ]
     }
 
-    provided_companies = []
-    if provided_raw:
-        provided_companies = [line.strip() for line in provided_raw.splitlines() if line.strip()]
+    provided_companies = list(filter(None, map(str.strip, provided_raw.splitlines()))) if provided_raw else []
 
     st.markdown("---")
     st.subheader("Your Inputs Summary")
@@ -293,40 +633,137 @@ def main():
             st.error("Please provide your OpenAI API key in the sidebar.")
             st.stop()
 
-        with st.spinner("Curating startups..."):
-            prompt = build_user_prompt(profile, prefs, provided_companies, top_n)
+        if model_choice == "auto":
+            model_choice = choose_model(profile, prefs, provided_companies)
+            st.caption(f"Routed to {model_choice}")
+
+        system_prompt = build_system_prompt()
+        placeholder = st.empty()
+
+        if len(provided_companies) > FANOUT_THRESHOLD:
+            # Large vetting lists decode faster as several short parallel
+            # requests than as one long serialized one.
+            chunks = [
+                provided_companies[i : i + FANOUT_CHUNK_SIZE]
+                for i in range(0, len(provided_companies), FANOUT_CHUNK_SIZE)
+            ]
+            chunk_ns = [
+                max(1, round(top_n * len(chunk) / len(provided_companies))) for chunk in chunks
+            ]
+            prompts = [
+                build_user_prompt(profile, prefs, tuple(chunk), n) for chunk, n in zip(chunks, chunk_ns)
+            ]
+            # Size the output budget for the largest chunk instead of the
+            # worst-case full list.
+            budget = min(200 + 200 * max(chunk_ns), 4000)
+            placeholder.markdown(f"Curating startups across {len(chunks)} parallel requests...")
             try:
-                raw_text = call_model(client, model_choice, prompt, temperature=temperature, max_tokens=2200)
+                raw_parts = call_model_fanout(
+                    model_choice,
+                    system_prompt,
+                    prompts,
+                    temperature=temperature,
+                    max_tokens=budget,
+                    use_cache=use_cache,
+                )
             except Exception as e:
+                placeholder.empty()
                 st.error(f"OpenAI API error: {e}")
                 st.stop()
-
-        data = parse_json_response(raw_text)
+            placeholder.empty()
+            raw_text = "\n\n".join(raw_parts)
+            data = merge_curations([parse_json_response(p) for p in raw_parts], top_n)
+        else:
+            prompt = build_user_prompt(profile, prefs, tuple(provided_companies), top_n)
+            # Each startup entry is ~150-200 output tokens; budget for the
+            # requested count rather than reserving the worst case.
+            budget = min(200 + 200 * top_n, 4000)
+            placeholder.markdown("Curating startups...")
+
+            raw_text = None
+            semantic_embedding = None
+            if use_cache:
+                try:
+                    raw_text, semantic_embedding = semantic_lookup(
+                        client, model_choice, profile, prefs, provided_companies, top_n, threshold=semantic_threshold
+                    )
+                except Exception:
+                    pass  # Embedding lookup is best-effort; fall back to the model call
+
+            if raw_text is None:
+                # Render each startup card as soon as its object closes in
+                # the stream, while the model is still generating the rest.
+                live_area = st.empty()
+                live_startups: List[Startup] = []
+
+                def on_startup(obj: Dict[str, Any]) -> None:
+                    try:
+                        startup = Startup.model_validate(obj)
+                    except Exception:
+                        return
+                    live_startups.append(startup)
+                    with live_area.container():
+                        for card in live_startups:
+                            st.markdown("---")
+                            render_startup_card(card)
+
+                try:
+                    caller = cached_call_model if use_cache else call_model
+                    raw_text = caller(
+                        client,
+                        model_choice,
+                        system_prompt,
+                        prompt,
+                        temperature=temperature,
+                        max_tokens=budget,
+                        placeholder=placeholder,
+                        on_startup=on_startup,
+                    )
+                except Exception as e:
+                    placeholder.empty()
+                    st.error(f"OpenAI API error: {e}")
+                    st.stop()
+                # The final validated result is rendered below; drop the
+                # live preview so cards aren't shown twice.
+                live_area.empty()
+                if use_cache and semantic_embedding is not None:
+                    semantic_store(model_choice, semantic_embedding, raw_text)
+            else:
+                placeholder.empty()
+
+            data = parse_json_response(raw_text)
         if not data:
             st.error("Failed to parse the model response as JSON. Showing raw output below.")
             with st.expander("Raw model output"):
                 st.text(raw_text)
             st.stop()
 
+        # Persist the results so later reruns re-render from session state
+        # instead of re-calling the LLM (or losing the list entirely).
+        st.session_state["curation"] = data
+        st.session_state["startups"] = data.startups
+        st.session_state["curation_bytes"] = orjson.dumps(data.model_dump(), option=orjson.OPT_INDENT_2)
         st.success("Curated list ready!")
-        st.caption(data.get("query_summary") or "")
 
-        startups = data.get("startups") or []
-        for s in startups:
+    if "curation" in st.session_state:
+        data = st.session_state["curation"]
+        st.caption(data.query_summary)
+
+        for s in st.session_state["startups"]:
             st.markdown("---")
             render_startup_card(s)
 
         st.markdown("---")
-        if data.get("notes"):
-            st.info(data["notes"])
-        if data.get("next_actions"):
+        if data.notes:
+            st.info(data.notes)
+        if data.next_actions:
             st.write("Next actions:")
-            for na in data["next_actions"]:
+            for na in data.next_actions:
                 st.write(f"- {na}")
 
         st.download_button(
             label="Download JSON",
-            data=json.dumps(data, indent=2),
+            data=st.session_state["curation_bytes"],
             file_name="startup_curation.json",
             mime="application/json",
         )